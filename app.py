@@ -1,19 +1,31 @@
 import eventlet
 eventlet.monkey_patch()
+from eventlet import tpool
 
 import os
 import shutil
 import tempfile
 import base64
-from datetime import datetime
+import functools
+import hashlib
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
 
-from flask import Flask, request, render_template, jsonify, Response
+from flask import Flask, request, render_template, jsonify, Response, make_response, g
 from flask_socketio import SocketIO, emit
 from werkzeug.utils import secure_filename
 from pymongo import MongoClient
 import whisper
+from whisper.tokenizer import LANGUAGES
 
 from jk import Config, GEMINI_API_KEY
+from similarity_index import IndexLockedError, SimilarityIndex
+from profiling import ProfileStore, profile_scope, profile_stage
+from scheduler import TranscriptionScheduler, PRIORITY_LIVE, PRIORITY_BATCH
+from segmentation import segment_bounds, split_into_chunks
 from google.generativeai.client import configure
 from google.generativeai.generative_models import GenerativeModel
 
@@ -22,6 +34,9 @@ app = Flask(__name__)
 app.config.from_object(Config)
 socketio = SocketIO(app)
 model = whisper.load_model("base")
+# Every Whisper call goes through the scheduler; segments run in a native thread
+# so a long transcription doesn't block the event loop
+transcription_scheduler = TranscriptionScheduler(lambda fn, previous: tpool.execute(fn, previous))
 
 # Gemini API Config
 if GEMINI_API_KEY:
@@ -33,6 +48,20 @@ else:
 mongo_client = MongoClient('mongodb://localhost:27017/')
 db = mongo_client['meeting_db']
 meetings_collection = db['meetings']
+meetings_collection.create_index('filename')
+meetings_collection.create_index('timestamp')
+meetings_collection.create_index('updated_at')
+meetings_collection.create_index('content_hash')
+meetings_collection.create_index('similarity_stale', sparse=True)
+uploads_collection = db['uploads']
+uploads_collection.create_index('upload_id', unique=True)
+uploads_collection.create_index([('status', 1), ('updated_at', 1)])
+
+# Related-meetings index
+similarity_index = SimilarityIndex(Config.SIMILARITY_INDEX_PATH, dim=Config.SIMILARITY_DIM)
+
+# Profiling
+profile_store = ProfileStore(Config.PROFILE_FOLDER, Config.PROFILE_HISTORY)
 
 # Ensure upload directory exists
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
@@ -42,39 +71,107 @@ if not os.path.exists(app.config['UPLOAD_FOLDER']):
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
-def transcribe_audio(file_path):
+def request_tenant():
+    return request.headers.get('X-Tenant-Id') or request.remote_addr or 'default'
+
+def transcribe_segment(audio, previous, options=None):
+    options = dict(options or {})
+    if previous:
+        # Carry the tail of the previous segment over as context across the cut,
+        # and reuse its language instead of detecting it again
+        options['initial_prompt'] = previous[-1]['text'][-200:]
+        options.setdefault('language', previous[0]['language'])
+    started = time.perf_counter()
+    result = model.transcribe(audio, **options)
+    result['elapsed'] = time.perf_counter() - started
+    return result
+
+def new_decode_state(language=None):
+    """Per-session Whisper state reused across live chunks: the language (detected
+    on the first chunk with speech, or given by the client) and the decode options
+    built once; with LIVE_PROMPT_PREVIOUS_TEXT, also the previous chunk's text as the prompt"""
+    options = {'fp16': model.device.type == 'cuda', 'without_timestamps': True}
+    if language:
+        options['language'] = language
+    return {
+        'options': options,
+        # The first chunk pays for cold caches and is kept out of the detect/cached
+        # comparison; seconds are model time, audio_seconds the audio they covered
+        'stats': {'first_chunk_seconds': None,
+                  'detect_chunks': 0, 'detect_seconds': 0.0, 'detect_audio_seconds': 0.0,
+                  'cached_chunks': 0, 'cached_seconds': 0.0, 'cached_audio_seconds': 0.0},
+    }
+
+def update_decode_state(state, results, audio_seconds):
+    text = " ".join(r['text'].strip() for r in results).strip()
+    elapsed = sum(r['elapsed'] for r in results)
+    stats = state['stats']
+    kind = 'cached' if 'language' in state['options'] else 'detect'
+    if stats['first_chunk_seconds'] is None:
+        stats['first_chunk_seconds'] = round(elapsed, 4)
+    else:
+        stats[f'{kind}_chunks'] += 1
+        stats[f'{kind}_seconds'] += elapsed
+        stats[f'{kind}_audio_seconds'] += audio_seconds
+    if kind == 'detect':
+        # Silence gives an unreliable guess, so only keep a language detected on speech
+        if text:
+            state['options']['language'] = results[0]['language']
+    if text and Config.LIVE_PROMPT_PREVIOUS_TEXT:
+        state['options']['initial_prompt'] = text[-200:]
+
+def transcribe_audio(file_path, priority=PRIORITY_BATCH, tenant='default', decode_state=None):
+    """Transcribe through the scheduler in windows of up to TRANSCRIBE_SEGMENT_SECONDS,
+    cut at pauses, so higher-priority work can run between the segments of a long recording"""
     if not shutil.which("ffmpeg"):
         raise RuntimeError("ffmpeg not found. Please install ffmpeg and add it to your system's PATH.")
-    result = model.transcribe(file_path)
-    return result["text"]
-
-def split_into_chunks(text, max_tokens=3000):
-    sentences = text.split('. ')
-    chunks, chunk = [], ""
-    for sentence in sentences:
-        if len(chunk + sentence) < max_tokens:
-            chunk += sentence + '. '
-        else:
-            chunks.append(chunk.strip())
-            chunk = sentence + '. '
-    if chunk:
-        chunks.append(chunk.strip())
-    return chunks
+    options = dict(decode_state['options']) if decode_state else None
+    with profile_stage('transcribe'):
+        audio = whisper.load_audio(file_path)
+        bounds = segment_bounds(audio, Config.TRANSCRIBE_SEGMENT_SECONDS * whisper.audio.SAMPLE_RATE,
+                                Config.TRANSCRIBE_CUT_SEARCH_SECONDS * whisper.audio.SAMPLE_RATE)
+        segments = (functools.partial(transcribe_segment, audio[start:end], options=options)
+                    for start, end in bounds)
+        results = transcription_scheduler.submit(segments, priority, tenant).wait()
+    if decode_state is not None:
+        update_decode_state(decode_state, results, len(audio) / whisper.audio.SAMPLE_RATE)
+    if len(results) == 1:
+        return results[0]['text']
+    return " ".join(r['text'].strip() for r in results if r['text'].strip())
 
-def summarize_meeting(transcript):
+SUMMARY_PROMPT = "Summarize this part of the meeting:\n\n{chunk}"
+
+def chunk_hash(chunk):
+    # The prompt is part of the key so a prompt change invalidates cached summaries
+    return hashlib.sha1((SUMMARY_PROMPT + chunk).encode()).hexdigest()
+
+def summarize_chunks(transcript, cached_chunks=None):
+    """Summarize a transcript chunk by chunk, reusing cached summaries for chunks
+    whose hash is unchanged. Returns (summary, summary_chunks, resummarized)"""
+    cached = {c['hash']: c['summary'] for c in cached_chunks or []}
     try:
         model = GenerativeModel('gemini-1.5-flash')
-        chunks = split_into_chunks(transcript)
-        all_summaries = []
-        for chunk in chunks:
-            response = model.generate_content(f"Summarize this part of the meeting:\n\n{chunk}")
-            all_summaries.append(response.text)
-        return " ".join(all_summaries)
+        summary_chunks = []
+        resummarized = 0
+        with profile_stage('summarize'):
+            for chunk in split_into_chunks(transcript):
+                digest = chunk_hash(chunk)
+                if digest not in cached:
+                    # The Gemini client (gRPC) blocks the event loop, so every call runs
+                    # in a native thread and live work keeps flowing during a summary
+                    response = tpool.execute(model.generate_content, SUMMARY_PROMPT.format(chunk=chunk))
+                    cached[digest] = response.text
+                    resummarized += 1
+                summary_chunks.append({'hash': digest, 'summary': cached[digest]})
+        return " ".join(c['summary'] for c in summary_chunks), summary_chunks, resummarized
     except Exception as e:
         app.logger.error("Gemini API Error: %s", e)
         raise
 
-def process_audio_file(audio_bytes, audio_format='audio/webm'):
+def summarize_meeting(transcript):
+    return summarize_chunks(transcript)[0]
+
+def process_audio_file(audio_bytes, audio_format='audio/webm', priority=PRIORITY_BATCH, tenant='default', decode_state=None):
     """Process audio file and return transcript and summary"""
     file_extension = '.webm' if 'webm' in audio_format else '.wav' if 'wav' in audio_format else '.mp4' if 'mp4' in audio_format else '.m4a' if 'm4a' in audio_format else '.webm'
     
@@ -86,7 +183,7 @@ def process_audio_file(audio_bytes, audio_format='audio/webm'):
         if os.path.getsize(temp_path) < 500:
             return "", "Audio too short to process"
         
-        transcript = transcribe_audio(temp_path)
+        transcript = transcribe_audio(temp_path, priority, tenant, decode_state)
         if transcript and isinstance(transcript, str) and transcript.strip():
             summary = summarize_meeting(transcript)
         else:
@@ -97,6 +194,511 @@ def process_audio_file(audio_bytes, audio_format='audio/webm'):
         if os.path.exists(temp_path):
             os.remove(temp_path)
 
+# --- Profiling Hooks ---
+def profiling_requested(flag):
+    return Config.PROFILING_ENABLED or str(flag).lower() in ('1', 'true', 'yes')
+
+def is_admin_request():
+    # No localhost fallback: behind a local reverse proxy every request comes from 127.0.0.1
+    return bool(Config.ADMIN_TOKEN) and request.headers.get('X-Admin-Token') == Config.ADMIN_TOKEN
+
+@app.before_request
+def start_request_profile():
+    if request.path.startswith('/admin/') or not profiling_requested(request.headers.get('X-Profile')):
+        return
+    g.profile_scope = profile_scope(profile_store, f"{request.method} {request.url_rule or request.path}", True,
+                                    {'path': request.path})
+    g.profile = g.profile_scope.__enter__()
+
+@app.after_request
+def add_profile_header(response):
+    profile = g.get('profile')
+    if profile:
+        response.headers['X-Profile-Id'] = profile['profile_id']
+    return response
+
+@app.teardown_request
+def finish_request_profile(exc):
+    scope = g.pop('profile_scope', None)
+    if scope is not None:
+        scope.__exit__(type(exc) if exc else None, exc, None)
+
+def profiled_event(name):
+    """Profile a socket handler when its payload sets 'profile' and report the id back"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(data=None, *args):
+            enabled = profiling_requested(data.get('profile') if isinstance(data, dict) else None)
+            with profile_scope(profile_store, name, enabled, {'sid': request.sid}) as profile:
+                result = handler(data, *args)
+            if profile:
+                emit('profile', {'event': name, 'profile_id': profile['profile_id']})
+            return result
+        return wrapper
+    return decorator
+
+# --- Meeting Versions & Conditional GET ---
+# A meeting's version is its latest `timestamp`/`updated_at`. The list version is
+# the document count plus the newest of those across the collection, read from
+# the indexes, so writes from other processes are picked up as well.
+rendered_meetings_cache = {}
+rendered_meetings_cache_lock = threading.Lock()
+
+def meeting_last_modified(meeting):
+    dates = [d for d in (meeting.get('timestamp'), meeting.get('updated_at')) if isinstance(d, datetime)]
+    return max(dates) if dates else None
+
+def meetings_list_version():
+    """Return (etag, last_modified) for the whole meetings collection"""
+    dates = []
+    for field in ('timestamp', 'updated_at'):
+        latest = meetings_collection.find_one({field: {'$type': 'date'}}, {field: 1}, sort=[(field, -1)])
+        if latest:
+            dates.append(latest[field])
+    last_modified = max(dates) if dates else None
+    count = meetings_collection.estimated_document_count()
+    token = f"{count}:{last_modified.isoformat() if last_modified else ''}"
+    return hashlib.md5(token.encode()).hexdigest(), last_modified
+
+def meeting_version(filename, variant=''):
+    """Return (etag, last_modified) for one meeting, or None if it doesn't exist"""
+    meeting = meetings_collection.find_one({'filename': filename}, {'timestamp': 1, 'updated_at': 1})
+    if not meeting:
+        return None
+    last_modified = meeting_last_modified(meeting)
+    token = f"{meeting['_id']}:{last_modified.isoformat() if last_modified else ''}:{variant}"
+    return hashlib.md5(token.encode()).hexdigest(), last_modified
+
+def is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= request.if_modified_since
+    return False
+
+def conditional_response(etag, last_modified, build_response):
+    """Answer 304 when the client copy is current, otherwise build the full response"""
+    if is_not_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        response = make_response(build_response())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.cache_control.no_cache = True
+    return response
+
+def cached_meetings_page(key, etag, render):
+    """Serve a rendered list page from the cache while the collection version is unchanged"""
+    with rendered_meetings_cache_lock:
+        cached = rendered_meetings_cache.get(key)
+    if cached and cached[0] == etag:
+        return cached[1], cached[2]
+    body, mimetype = render()
+    with rendered_meetings_cache_lock:
+        rendered_meetings_cache[key] = (etag, body, mimetype)
+    return body, mimetype
+
+def invalidate_meetings_cache():
+    with rendered_meetings_cache_lock:
+        rendered_meetings_cache.clear()
+
+def index_meeting(filename, transcript, summary):
+    try:
+        similarity_index.add(filename, f"{summary or ''}\n{transcript or ''}")
+    except IndexLockedError:
+        # Another process owns the index; its reindex loop picks the meeting up
+        meetings_collection.update_one({'filename': filename}, {'$set': {'similarity_stale': True}})
+    except Exception as e:
+        app.logger.error(f"Similarity index error for {filename}: {str(e)}")
+
+def reindex_meetings(query, missing_only=False):
+    """Index the meetings matching `query` in batches and clear their similarity_stale flag"""
+    batch = []
+
+    def flush():
+        similarity_index.add_many(batch)
+        meetings_collection.update_many({'filename': {'$in': [key for key, _ in batch]}},
+                                        {'$unset': {'similarity_stale': ''}})
+        batch.clear()
+
+    projection = {'filename': 1, 'transcript': 1, 'summary': 1}
+    for meeting in meetings_collection.find(query, projection).batch_size(500):
+        if not meeting.get('filename') or (missing_only and meeting['filename'] in similarity_index):
+            continue
+        batch.append((meeting['filename'], f"{meeting.get('summary') or ''}\n{meeting.get('transcript') or ''}"))
+        if len(batch) == 500:
+            flush()
+    if batch:
+        flush()
+
+def backfill_similarity_index():
+    """In the process that owns the index: index meetings it hasn't seen yet, then keep
+    re-indexing meetings changed by other workers or the reprocess CLI"""
+    backfilled = False
+    while True:
+        try:
+            if similarity_index.acquire_writer():
+                if not backfilled:
+                    reindex_meetings({}, missing_only=True)
+                    backfilled = True
+                    app.logger.info(f"Similarity index holds {len(similarity_index)} meetings")
+                reindex_meetings({'similarity_stale': True})
+        except Exception as e:
+            app.logger.error(f"Similarity reindex error: {str(e)}")
+        socketio.sleep(Config.SIMILARITY_REINDEX_INTERVAL)
+
+# --- Background Tasks ---
+# Started once per serving process on its first request, so they also run under a
+# WSGI server (one set per worker; only the worker holding the index writer lock
+# re-indexes). The reloader parent of `python app.py` serves no requests and never
+# starts them, so it cannot take the writer lock from the serving child.
+background_tasks_lock = threading.Lock()
+background_tasks_started = False
+
+@app.before_request
+def start_background_tasks():
+    global background_tasks_started
+    if background_tasks_started:
+        return
+    with background_tasks_lock:
+        if background_tasks_started:
+            return
+        background_tasks_started = True
+    socketio.start_background_task(backfill_similarity_index)
+    socketio.start_background_task(upload_cleanup_loop)
+
+def resummarize_transcript(filename, transcript, cached_chunks):
+    """Re-summarize an edited transcript, calling the LLM only for changed chunks, and store it"""
+    summary, summary_chunks, resummarized = summarize_chunks(transcript, cached_chunks)
+    meetings_collection.update_one(
+        {'filename': filename},
+        {
+            '$set': {
+                'transcript': transcript,
+                'summary': summary,
+                'summary_chunks': summary_chunks,
+                'updated_at': datetime.utcnow()
+            }
+        }
+    )
+    invalidate_meetings_cache()
+    index_meeting(filename, transcript, summary)
+    app.logger.info(f"Re-summarized {filename}: {resummarized}/{len(summary_chunks)} chunks changed")
+    return summary, summary_chunks, resummarized
+
+# Bookkeeping fields that never leave the server (list pages, JSON and the page cache)
+INTERNAL_MEETING_FIELDS = {'summary_chunks': 0, 'content_hash': 0, 'similarity_stale': 0}
+
+def load_sorted_meetings():
+    meetings = list(meetings_collection.find({}, {'_id': 0, **INTERNAL_MEETING_FIELDS}))
+    meetings.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+    return meetings
+
+# --- Chunked Uploads ---
+# Recordings are sent as init -> PUT chunks at explicit offsets -> finalize. Bytes
+# are streamed straight to uploads/<upload_id>.part and hashed as they arrive;
+# upload state lives in Mongo so a client can resume from the stored offset.
+upload_hashers = {}
+upload_locks = {}
+upload_locks_lock = threading.Lock()
+
+def upload_part_path(upload_id):
+    return os.path.join(app.config['UPLOAD_FOLDER'], f"{upload_id}.part")
+
+def get_upload_lock(upload_id):
+    with upload_locks_lock:
+        return upload_locks.setdefault(upload_id, threading.Lock())
+
+def forget_upload(upload_id):
+    """Drop the in-memory lock and hasher of a finished or expired upload"""
+    upload_hashers.pop(upload_id, None)
+    with upload_locks_lock:
+        upload_locks.pop(upload_id, None)
+
+def start_upload_processing(upload_id, from_statuses, stale_before=None):
+    """Atomically move an upload to 'processing' and run it; returns True if this call started it"""
+    query = {'upload_id': upload_id, 'status': {'$in': from_statuses}}
+    if stale_before is not None:
+        query['$or'] = [{'status': {'$ne': 'processing'}}, {'heartbeat_at': {'$lt': stale_before}},
+                        {'heartbeat_at': {'$exists': False}}]
+    now = datetime.utcnow()
+    result = uploads_collection.update_one(
+        query,
+        {'$set': {'status': 'processing', 'heartbeat_at': now, 'updated_at': now}, '$unset': {'error': ''}}
+    )
+    if result.modified_count:
+        socketio.start_background_task(process_completed_upload, upload_id)
+    return bool(result.modified_count)
+
+def upload_heartbeat(upload_id, done):
+    # Lets finalize tell a running job from one lost in a process restart
+    while not done.is_set():
+        socketio.sleep(Config.UPLOAD_HEARTBEAT_SECONDS)
+        if not done.is_set():
+            uploads_collection.update_one(
+                {'upload_id': upload_id, 'status': 'processing'},
+                {'$set': {'heartbeat_at': datetime.utcnow()}}
+            )
+
+def remove_part_file(path):
+    # Every server process runs the cleanup loop, so another one may have got here first
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def cleanup_stale_uploads():
+    """Expire unfinished and failed uploads past UPLOAD_TTL_SECONDS and delete orphaned part files"""
+    cutoff = datetime.utcnow() - timedelta(seconds=Config.UPLOAD_TTL_SECONDS)
+    expired = 0
+    for upload in uploads_collection.find({'status': {'$in': ['uploading', 'failed']}, 'updated_at': {'$lt': cutoff}},
+                                          {'upload_id': 1}):
+        result = uploads_collection.update_one(
+            {'upload_id': upload['upload_id'], 'status': {'$in': ['uploading', 'failed']}},
+            {'$set': {'status': 'expired', 'updated_at': datetime.utcnow()}}
+        )
+        if result.modified_count:
+            expired += 1
+            remove_part_file(upload_part_path(upload['upload_id']))
+            forget_upload(upload['upload_id'])
+
+    for name in os.listdir(app.config['UPLOAD_FOLDER']):
+        if not name.endswith('.part'):
+            continue
+        upload_id = name[:-len('.part')]
+        upload = uploads_collection.find_one({'upload_id': upload_id}, {'status': 1})
+        if not upload or upload['status'] in ('complete', 'expired'):
+            remove_part_file(os.path.join(app.config['UPLOAD_FOLDER'], name))
+            forget_upload(upload_id)
+    if expired:
+        app.logger.info(f"Expired {expired} stale upload(s)")
+
+def upload_cleanup_loop():
+    while True:
+        try:
+            cleanup_stale_uploads()
+        except Exception as e:
+            app.logger.error(f"Upload cleanup error: {str(e)}")
+        socketio.sleep(Config.UPLOAD_CLEANUP_INTERVAL)
+
+def get_upload_hasher(upload):
+    """Return a SHA-256 covering the first `offset` bytes, re-hashing the part file if needed"""
+    upload_id, offset = upload['upload_id'], upload['offset']
+    cached = upload_hashers.get(upload_id)
+    if cached and cached[1] == offset:
+        return cached[0]
+
+    hasher = hashlib.sha256()
+    path = upload_part_path(upload_id)
+    if os.path.exists(path):
+        remaining = offset
+        with open(path, 'rb') as f:
+            while remaining > 0:
+                block = f.read(min(Config.UPLOAD_READ_BLOCK, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+    upload_hashers[upload_id] = (hasher, offset)
+    return hasher
+
+def upload_status_payload(upload):
+    payload = {
+        'upload_id': upload['upload_id'],
+        'filename': upload['filename'],
+        'size': upload['size'],
+        'offset': upload['offset'],
+        'status': upload['status'],
+        'chunk_size': Config.UPLOAD_CHUNK_SIZE,
+    }
+    for key in ('content_hash', 'summary', 'transcript', 'meeting_filename', 'deduplicated', 'error', 'profile_id'):
+        if key in upload:
+            payload[key] = upload[key]
+    return payload
+
+def process_completed_upload(upload_id):
+    """Transcribe and summarize a fully received upload, reusing results for identical audio"""
+    upload = uploads_collection.find_one({'upload_id': upload_id})
+    done = threading.Event()
+    socketio.start_background_task(upload_heartbeat, upload_id, done)
+    try:
+        with profile_scope(profile_store, 'process_upload', profiling_requested(upload.get('profile')),
+                           {'upload_id': upload_id, 'size': upload['size']}) as profile:
+            if profile:
+                uploads_collection.update_one({'upload_id': upload_id}, {'$set': {'profile_id': profile['profile_id']}})
+            run_upload_pipeline(upload)
+    finally:
+        done.set()
+
+def run_upload_pipeline(upload):
+    upload_id = upload['upload_id']
+    path = upload_part_path(upload_id)
+    try:
+        existing = meetings_collection.find_one(
+            {'content_hash': upload['content_hash']},
+            {'filename': 1, 'summary': 1, 'transcript': 1}
+        )
+        if existing:
+            result = {
+                'summary': existing['summary'],
+                'transcript': existing['transcript'],
+                'meeting_filename': existing['filename'],
+                'deduplicated': True,
+            }
+        else:
+            transcript = transcribe_audio(path, PRIORITY_BATCH, upload.get('tenant', 'default'))
+            summary, summary_chunks, _ = summarize_chunks(transcript)
+            filename = secure_filename(upload['filename'])
+            meetings_collection.insert_one({
+                'filename': filename,
+                'summary': summary,
+                'summary_chunks': summary_chunks,
+                'transcript': transcript,
+                'timestamp': datetime.utcnow(),
+                'meeting_type': 'upload',
+                'content_hash': upload['content_hash']
+            })
+            invalidate_meetings_cache()
+            index_meeting(filename, transcript, summary)
+            result = {
+                'summary': summary,
+                'transcript': transcript,
+                'meeting_filename': filename,
+                'deduplicated': False,
+            }
+
+        uploads_collection.update_one(
+            {'upload_id': upload_id},
+            {'$set': dict(result, status='complete', updated_at=datetime.utcnow())}
+        )
+        if os.path.exists(path):
+            os.remove(path)
+        forget_upload(upload_id)
+    except Exception as e:
+        # Keep the part file so finalize can retry without a re-upload
+        app.logger.error(f"Chunked upload processing error for {upload_id}: {str(e)}")
+        upload_hashers.pop(upload_id, None)
+        uploads_collection.update_one(
+            {'upload_id': upload_id},
+            {'$set': {'status': 'failed', 'error': str(e), 'updated_at': datetime.utcnow()}}
+        )
+
+# --- Live Session Queues ---
+# Each Socket.IO session gets a bounded inbound queue of audio chunks. A single
+# background task per session drains it; whatever piled up while the previous
+# request was being transcribed is merged into one longer request.
+live_sessions = {}
+live_sessions_lock = threading.Lock()
+
+def get_live_session(sid):
+    with live_sessions_lock:
+        session = live_sessions.get(sid)
+        if session is None:
+            session = {
+                'queue': deque(),
+                'lock': threading.Lock(),
+                'draining': False,
+                'dropped': 0,
+                'timeslice_ms': Config.LIVE_TIMESLICE_MS,
+                'decode': new_decode_state(),
+            }
+            live_sessions[sid] = session
+        return session
+
+def live_queue_stats(session):
+    queue = session['queue']
+    lag = time.monotonic() - queue[0]['received_at'] if queue else 0.0
+    return {
+        'queue_depth': sum(item['chunks'] for item in queue),
+        'queue_bytes': sum(len(item['audio']) for item in queue),
+        'lag_seconds': round(lag, 2),
+        'dropped': session['dropped'],
+    }
+
+def enqueue_live_chunk(sid, audio_bytes, audio_format, profile=False):
+    """Queue a live chunk for transcription; returns True if a drain task must be started"""
+    session = get_live_session(sid)
+    with session['lock']:
+        queue = session['queue']
+        if len(queue) >= Config.LIVE_QUEUE_MAX_DEPTH:
+            tail = queue[-1]
+            if tail['format'] == audio_format and len(tail['audio']) + len(audio_bytes) <= Config.LIVE_COALESCE_MAX_BYTES:
+                tail['audio'] += audio_bytes
+                tail['chunks'] += 1
+                tail['profile'] = tail['profile'] or profile
+                audio_bytes = None
+            else:
+                # The head may already be a merged batch of several chunks
+                session['dropped'] += queue.popleft()['chunks']
+        if audio_bytes is not None:
+            queue.append({
+                'audio': bytearray(audio_bytes),
+                'format': audio_format,
+                'chunks': 1,
+                'received_at': time.monotonic(),
+                'profile': profile,
+            })
+        start_drain = not session['draining']
+        session['draining'] = True
+    return start_drain
+
+def take_coalesced_batch(session):
+    """Pop the head of the queue merged with every following chunk of the same format"""
+    queue = session['queue']
+    batch = queue.popleft()
+    while queue and queue[0]['format'] == batch['format'] \
+            and len(batch['audio']) + len(queue[0]['audio']) <= Config.LIVE_COALESCE_MAX_BYTES:
+        item = queue.popleft()
+        batch['audio'] += item['audio']
+        batch['chunks'] += item['chunks']
+        batch['profile'] = batch['profile'] or item['profile']
+    return batch
+
+def emit_backpressure(sid, session, adjust_timeslice=True):
+    """Report queue depth and lag, and suggest a MediaRecorder timeslice to the client"""
+    with session['lock']:
+        stats = live_queue_stats(session)
+        throttle = stats['queue_depth'] >= Config.LIVE_BACKPRESSURE_DEPTH or stats['lag_seconds'] >= Config.LIVE_BACKPRESSURE_LAG
+        if adjust_timeslice and throttle:
+            session['timeslice_ms'] = min(session['timeslice_ms'] * 2, Config.LIVE_MAX_TIMESLICE_MS)
+        elif adjust_timeslice and stats['queue_depth'] == 0:
+            session['timeslice_ms'] = max(session['timeslice_ms'] // 2, Config.LIVE_TIMESLICE_MS)
+        stats['throttle'] = throttle
+        stats['timeslice_ms'] = session['timeslice_ms']
+    socketio.emit('backpressure', stats, to=sid)
+
+def drain_live_queue(sid):
+    while True:
+        session = live_sessions.get(sid)
+        if session is None:
+            return
+        with session['lock']:
+            if not session['queue']:
+                session['draining'] = False
+                return
+            batch = take_coalesced_batch(session)
+
+        with profile_scope(profile_store, 'audio_chunk', profiling_requested(batch['profile']),
+                           {'sid': sid, 'chunks': batch['chunks'], 'bytes': len(batch['audio'])}) as profile:
+            try:
+                transcript, notes = process_audio_file(bytes(batch['audio']), batch['format'], PRIORITY_LIVE, sid,
+                                                       session['decode'])
+                payload = {'transcript': transcript, 'notes': notes, 'success': True}
+            except Exception as e:
+                app.logger.error(f"Audio chunk error: {str(e)}")
+                payload = {'transcript': '', 'notes': '', 'error': str(e), 'success': False}
+        if profile:
+            payload['profile_id'] = profile['profile_id']
+
+        payload['language'] = session['decode']['options'].get('language')
+        payload['chunks'] = batch['chunks']
+        payload['lag_seconds'] = round(time.monotonic() - batch['received_at'], 2)
+        socketio.emit('transcript', payload, to=sid)
+        emit_backpressure(sid, session)
+
 # --- Routes ---
 @app.route('/')
 def index():
@@ -119,16 +721,19 @@ def upload_file():
             os.remove(filepath)
             return jsonify({'error': 'File is too large. Maximum size is 16MB.'}), 400
 
-        transcript = transcribe_audio(filepath)
-        summary = summarize_meeting(transcript)
+        transcript = transcribe_audio(filepath, PRIORITY_BATCH, request_tenant())
+        summary, summary_chunks, _ = summarize_chunks(transcript)
 
         meetings_collection.insert_one({
             'filename': filename,
             'summary': summary,
+            'summary_chunks': summary_chunks,
             'transcript': transcript,
             'timestamp': datetime.utcnow(),
             'meeting_type': 'upload'
         })
+        invalidate_meetings_cache()
+        index_meeting(filename, transcript, summary)
 
         os.remove(filepath)
         return jsonify({'summary': summary, 'transcript': transcript})
@@ -139,20 +744,155 @@ def upload_file():
             os.remove(filepath)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/upload/init', methods=['POST'])
+def init_upload():
+    data = request.get_json() or {}
+    filename = data.get('filename')
+    size = data.get('size')
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'Invalid file'}), 400
+    if not isinstance(size, int) or size <= 0:
+        return jsonify({'error': 'File size is required'}), 400
+    if size > Config.MAX_UPLOAD_SIZE:
+        return jsonify({'error': 'File is too large.'}), 400
+
+    upload = {
+        'upload_id': uuid.uuid4().hex,
+        'filename': secure_filename(filename),
+        'size': size,
+        'offset': 0,
+        'status': 'uploading',
+        'profile': profiling_requested(request.headers.get('X-Profile')),
+        'tenant': request_tenant(),
+        'created_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow()
+    }
+    uploads_collection.insert_one(upload)
+    return jsonify(upload_status_payload(upload)), 201
+
+@app.route('/upload/<upload_id>', methods=['GET'])
+def get_upload_status(upload_id):
+    upload = uploads_collection.find_one({'upload_id': upload_id})
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(upload_status_payload(upload))
+
+@app.route('/upload/<upload_id>', methods=['PUT'])
+def append_upload_chunk(upload_id):
+    offset = request.args.get('offset', type=int)
+    if request.content_length and request.content_length > Config.UPLOAD_CHUNK_SIZE:
+        return jsonify({'error': 'Chunk is too large.', 'chunk_size': Config.UPLOAD_CHUNK_SIZE}), 413
+
+    # Only create a lock for uploads that exist
+    if not uploads_collection.find_one({'upload_id': upload_id}, {'_id': 1}):
+        return jsonify({'error': 'Upload not found'}), 404
+
+    with get_upload_lock(upload_id):
+        upload = uploads_collection.find_one({'upload_id': upload_id})
+        if not upload:
+            return jsonify({'error': 'Upload not found'}), 404
+        if upload['status'] != 'uploading':
+            return jsonify(upload_status_payload(upload)), 409
+        if offset != upload['offset']:
+            return jsonify(dict(upload_status_payload(upload), error='Offset mismatch')), 409
+
+        hasher = get_upload_hasher(upload)
+        path = upload_part_path(upload_id)
+        written = 0
+        try:
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                # Drop any bytes left behind by an interrupted chunk
+                f.truncate(offset)
+                f.seek(offset)
+                while True:
+                    with profile_stage('receive'):
+                        block = request.stream.read(Config.UPLOAD_READ_BLOCK)
+                    if not block:
+                        break
+                    written += len(block)
+                    if written > Config.UPLOAD_CHUNK_SIZE or offset + written > upload['size']:
+                        raise ValueError('Chunk exceeds the declared upload size')
+                    f.write(block)
+                    hasher.update(block)
+        except ValueError as e:
+            upload_hashers.pop(upload_id, None)
+            return jsonify(dict(upload_status_payload(upload), error=str(e))), 400
+        except Exception as e:
+            upload_hashers.pop(upload_id, None)
+            app.logger.error(f"Chunk upload error for {upload_id}: {str(e)}")
+            return jsonify(dict(upload_status_payload(upload), error=str(e))), 500
+
+        new_offset = offset + written
+        update = {'offset': new_offset, 'updated_at': datetime.utcnow()}
+        complete = new_offset == upload['size']
+        if complete:
+            update.update(status='processing', content_hash=hasher.hexdigest(), heartbeat_at=update['updated_at'])
+        upload_hashers[upload_id] = (hasher, new_offset)
+
+        result = uploads_collection.update_one(
+            {'upload_id': upload_id, 'status': 'uploading', 'offset': offset},
+            {'$set': update}
+        )
+        if result.matched_count == 0:
+            upload_hashers.pop(upload_id, None)
+            current = uploads_collection.find_one({'upload_id': upload_id})
+            return jsonify(dict(upload_status_payload(current), error='Upload was modified concurrently')), 409
+        upload.update(update)
+
+    if complete:
+        socketio.start_background_task(process_completed_upload, upload_id)
+    return jsonify(upload_status_payload(upload))
+
+@app.route('/upload/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    upload = uploads_collection.find_one({'upload_id': upload_id})
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    if upload['offset'] < upload['size']:
+        return jsonify(dict(upload_status_payload(upload), error='Upload is incomplete')), 409
+
+    # Retry failed uploads, and processing ones whose job stopped sending
+    # heartbeats (e.g. the process restarted mid-transcription)
+    stale_before = datetime.utcnow() - timedelta(seconds=Config.UPLOAD_STALE_SECONDS)
+    restartable = upload['status'] == 'failed' or (
+        upload['status'] == 'processing' and upload.get('heartbeat_at', datetime.min) < stale_before)
+    if restartable and os.path.exists(upload_part_path(upload_id)):
+        start_upload_processing(upload_id, ['failed', 'processing'], stale_before)
+        upload = uploads_collection.find_one({'upload_id': upload_id})
+
+    status_code = 200 if upload['status'] in ('complete', 'failed', 'expired') else 202
+    return jsonify(upload_status_payload(upload)), status_code
+
 @app.route('/meetings', methods=['GET'])
 def get_meetings():
-    meetings = list(meetings_collection.find({}, {'_id': 0}))
-    meetings.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-    return jsonify({'meetings': meetings})
+    etag, last_modified = meetings_list_version()
+
+    def build():
+        body, mimetype = cached_meetings_page('meetings', etag, lambda: (
+            jsonify({'meetings': load_sorted_meetings()}).get_data(), 'application/json'))
+        return Response(body, mimetype=mimetype)
+
+    return conditional_response(etag, last_modified, build)
 
 @app.route('/meetings/history')
 def meetings_history():
-    meetings = list(meetings_collection.find({}, {'_id': 0}))
-    meetings.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-    return render_template('meetings.html', meetings=meetings)
+    etag, last_modified = meetings_list_version()
+
+    def build():
+        body, mimetype = cached_meetings_page('history', etag, lambda: (
+            render_template('meetings.html', meetings=load_sorted_meetings()), 'text/html'))
+        return Response(body, mimetype=mimetype)
+
+    return conditional_response(etag, last_modified, build)
 
 @app.route('/download/<filename>')
 def download_transcript(filename):
+    version = meeting_version(filename, 'download')
+    if not version:
+        return jsonify({'error': 'Meeting not found'}), 404
+    return conditional_response(*version, lambda: build_transcript_download(filename))
+
+def build_transcript_download(filename):
     meeting = meetings_collection.find_one({'filename': filename})
     if not meeting:
         return jsonify({'error': 'Meeting not found'}), 404
@@ -174,11 +914,67 @@ TRANSCRIPT:
 
 @app.route('/meeting/<filename>')
 def get_meeting(filename):
-    meeting = meetings_collection.find_one({'filename': filename})
+    version = meeting_version(filename)
+    if not version:
+        return jsonify({'error': 'Meeting not found'}), 404
+
+    def build():
+        meeting = meetings_collection.find_one({'filename': filename}, INTERNAL_MEETING_FIELDS)
+        if not meeting:
+            return jsonify({'error': 'Meeting not found'}), 404
+        meeting['_id'] = str(meeting['_id'])
+        return jsonify(meeting)
+
+    return conditional_response(*version, build)
+
+@app.route('/meeting/<filename>/related')
+def get_related_meetings(filename):
+    k = min(request.args.get('k', 5, type=int), 50)
+    if filename in similarity_index:
+        scores = dict(similarity_index.related(filename, k))
+    else:
+        meeting = meetings_collection.find_one({'filename': filename}, {'transcript': 1, 'summary': 1})
+        if not meeting:
+            return jsonify({'error': 'Meeting not found'}), 404
+        index_meeting(filename, meeting.get('transcript'), meeting.get('summary'))
+        # Workers without the writer lock only flag the meeting, so score it directly
+        text = f"{meeting.get('summary') or ''}\n{meeting.get('transcript') or ''}"
+        scores = dict(similarity_index.query(similarity_index.vectorize(text), k, exclude=filename))
+    related = []
+    if scores:
+        found = meetings_collection.find(
+            {'filename': {'$in': list(scores)}},
+            {'_id': 0, 'filename': 1, 'timestamp': 1, 'meeting_type': 1, 'summary': 1}
+        )
+        related = sorted(found, key=lambda m: scores[m['filename']], reverse=True)
+        for meeting in related:
+            meeting['score'] = round(scores[meeting['filename']], 4)
+    return jsonify({'filename': filename, 'related': related})
+
+@app.route('/meeting/<filename>/resummarize', methods=['POST'])
+def resummarize_meeting(filename):
+    data = request.get_json(silent=True) or {}
+    meeting = meetings_collection.find_one({'filename': filename}, {'transcript': 1, 'summary_chunks': 1})
     if not meeting:
         return jsonify({'error': 'Meeting not found'}), 404
-    meeting['_id'] = str(meeting['_id'])
-    return jsonify(meeting)
+
+    transcript = data.get('transcript', meeting.get('transcript') or '')
+    if not transcript.strip():
+        return jsonify({'error': 'Transcript is required'}), 400
+
+    try:
+        summary, summary_chunks, resummarized = resummarize_transcript(filename, transcript, meeting.get('summary_chunks'))
+        return jsonify({
+            'success': True,
+            'filename': filename,
+            'summary': summary,
+            'chunks': len(summary_chunks),
+            'resummarized': resummarized,
+            'reused': len(summary_chunks) - resummarized
+        })
+    except Exception as e:
+        app.logger.error(f"Error re-summarizing meeting {filename}: {str(e)}")
+        return jsonify({'error': f'Failed to re-summarize meeting: {str(e)}'}), 500
 
 @app.route('/meeting/<filename>', methods=['PUT'])
 def update_meeting(filename):
@@ -197,9 +993,11 @@ def update_meeting(filename):
                 }
             }
         )
+        invalidate_meetings_cache()
         
         if result.matched_count == 0:
             return jsonify({'error': 'Meeting not found'}), 404
+        index_meeting(filename, data['transcript'], data['summary'])
         
         return jsonify({
             'success': True,
@@ -211,6 +1009,61 @@ def update_meeting(filename):
         app.logger.error(f"Error updating meeting {filename}: {str(e)}")
         return jsonify({'error': f'Failed to update meeting: {str(e)}'}), 500
 
+@app.route('/admin/profiles')
+def list_profiles():
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    stage = request.args.get('stage')
+    limit = min(request.args.get('limit', 20, type=int), Config.PROFILE_HISTORY)
+    profiles = profile_store.slowest(stage, limit)
+    stages = sorted({name for p in profile_store.slowest(limit=Config.PROFILE_HISTORY) for name in p['stages']})
+    return jsonify({'stage': stage, 'stages': stages, 'profiles': profiles})
+
+@app.route('/admin/scheduler')
+def scheduler_stats():
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(transcription_scheduler.stats())
+
+@app.route('/admin/live-sessions')
+def live_session_stats():
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    with live_sessions_lock:
+        sessions = dict(live_sessions)
+    result = {}
+    for sid, session in sessions.items():
+        stats = dict(session['decode']['stats'])
+        for kind in ('detect', 'cached'):
+            count, audio_seconds = stats[f'{kind}_chunks'], stats[f'{kind}_audio_seconds']
+            stats[f'{kind}_avg_seconds'] = round(stats[f'{kind}_seconds'] / count, 4) if count else None
+            # Coalesced batches vary in length, so compare model time per second of audio
+            stats[f'{kind}_seconds_per_audio_second'] = \
+                round(stats[f'{kind}_seconds'] / audio_seconds, 4) if audio_seconds else None
+        with session['lock']:
+            queue_stats = live_queue_stats(session)
+        result[sid] = dict(queue_stats, language=session['decode']['options'].get('language'),
+                           decode_stats=stats)
+    return jsonify({'sessions': result})
+
+@app.route('/admin/profiles/<profile_id>')
+def get_profile(profile_id):
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    profile = profile_store.get(profile_id)
+    if not profile:
+        return jsonify({'error': 'Profile not found'}), 404
+    if request.args.get('format') == 'prof' and profile['has_cprofile']:
+        with open(profile_store.path(profile_id), 'rb') as f:
+            response = Response(f.read(), mimetype='application/octet-stream')
+        response.headers['Content-Disposition'] = f'attachment; filename="{profile_id}.prof"'
+        return response
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'calls'):
+        return jsonify({'error': 'sort must be cumulative, tottime or calls'}), 400
+    stats = profile_store.stats_text(profile_id, sort) if profile['has_cprofile'] else None
+    return jsonify(dict(profile, stats=stats))
+
 @app.route('/live')
 def live_meeting():
     return render_template('live.html')
@@ -238,6 +1091,8 @@ def save_meeting():
             'meeting_type': meeting_type
         }
         result = meetings_collection.insert_one(meeting_data)
+        invalidate_meetings_cache()
+        index_meeting(filename, transcript, summary)
         return jsonify({'success': True, 'message': 'Meeting saved successfully!', 'meeting_id': str(result.inserted_id), 'filename': filename})
     except Exception as e:
         app.logger.error(f"Save meeting error: {str(e)}")
@@ -245,16 +1100,18 @@ def save_meeting():
 
 # --- Socket Handlers ---
 @socketio.on('audio_chunk')
+@profiled_event('audio_chunk_receive')
 def handle_audio_chunk(data):
     try:
         audio_bytes = base64.b64decode(data['audio'])
-        transcript, notes = process_audio_file(audio_bytes, data.get('format', 'audio/webm'))
-        
-        emit('transcript', {
-            'transcript': transcript, 
-            'notes': notes,
-            'success': True
-        })
+        sid = request.sid
+        language = data.get('language')
+        if language in LANGUAGES:
+            get_live_session(sid)['decode']['options']['language'] = language
+        if enqueue_live_chunk(sid, audio_bytes, data.get('format', 'audio/webm'), bool(data.get('profile'))):
+            socketio.start_background_task(drain_live_queue, sid)
+        else:
+            emit_backpressure(sid, get_live_session(sid), adjust_timeslice=False)
         
     except Exception as e:
         app.logger.error(f"Audio chunk error: {str(e)}")
@@ -265,7 +1122,13 @@ def handle_audio_chunk(data):
             'success': False
         })
 
+@socketio.on('disconnect')
+def handle_disconnect():
+    with live_sessions_lock:
+        live_sessions.pop(request.sid, None)
+
 @socketio.on('save_live_meeting')
+@profiled_event('save_live_meeting')
 def save_live_meeting(data):
     try:
         transcript = data.get('transcript', '')
@@ -291,6 +1154,8 @@ def save_live_meeting(data):
         }
         
         result = meetings_collection.insert_one(meeting_data)
+        invalidate_meetings_cache()
+        index_meeting(filename, transcript, notes)
         
         emit('save_status', {
             'success': True, 
@@ -307,10 +1172,12 @@ def save_live_meeting(data):
         })
 
 @socketio.on('transcribe_complete_audio')
+@profiled_event('transcribe_complete_audio')
 def handle_complete_audio_transcription(data):
     try:
         audio_bytes = base64.b64decode(data['audio'])
-        transcript, summary = process_audio_file(audio_bytes, data.get('format', 'audio/webm'))
+        transcript, summary = process_audio_file(audio_bytes, data.get('format', 'audio/webm'),
+                                                 PRIORITY_BATCH, request_tenant())
         
         emit('transcription_complete', {
             'transcript': transcript, 
@@ -328,6 +1195,7 @@ def handle_complete_audio_transcription(data):
         })
 
 @socketio.on('update_live_meeting')
+@profiled_event('update_live_meeting')
 def update_live_meeting(data):
     try:
         filename = data.get('filename')
@@ -343,6 +1211,21 @@ def update_live_meeting(data):
             emit('update_status', {'success': False, 'error': 'Transcript and summary are required'})
             return
         
+        if data.get('resummarize'):
+            meeting = meetings_collection.find_one({'filename': filename}, {'summary_chunks': 1})
+            if not meeting:
+                emit('update_status', {'success': False, 'error': 'Meeting not found'})
+                return
+            summary, summary_chunks, resummarized = resummarize_transcript(filename, transcript, meeting.get('summary_chunks'))
+            emit('update_status', {
+                'success': True,
+                'message': 'Meeting updated successfully',
+                'summary': summary,
+                'resummarized': resummarized,
+                'reused': len(summary_chunks) - resummarized
+            })
+            return
+        
         app.logger.info(f"Updating live meeting: {filename}")
         app.logger.info(f"Transcript length: {len(transcript) if transcript else 0}")
         app.logger.info(f"Summary length: {len(summary) if summary else 0}")
@@ -357,8 +1240,10 @@ def update_live_meeting(data):
                 }
             }
         )
+        invalidate_meetings_cache()
         
         if result.matched_count > 0:
+            index_meeting(filename, transcript, summary)
             app.logger.info(f"Successfully updated meeting: {filename}")
             emit('update_status', {'success': True, 'message': 'Meeting updated successfully'})
         else:
@@ -0,0 +1,161 @@
+"""Benchmark per-session decode state for live chunks.
+
+Slices a recording into live-sized chunks and transcribes them three ways:
+
+  baseline   model.transcribe(chunk) with defaults: language detection on every chunk
+  language   language detected once, then passed on every later chunk
+  session    language plus the options app.new_decode_state() reuses
+             (fp16 matched to the device, no timestamp tokens, previous text as prompt)
+
+The first difference is the language-detection saving, the second the
+decoder-option/warm-state saving. Also times a bare detect_language pass.
+Every setup is warmed up first, so no setup pays for the cold first chunk.
+
+    python bench_language_cache.py meeting.wav --chunk-seconds 3 --chunks 40
+
+Without a recording or downloaded weights, --random-weights builds the model
+architecture with random weights and times the same passes on synthetic audio:
+detect_language, then decoding a fixed number of tokens (end-of-text is
+suppressed, so every setup decodes the same length). The cost of a pass does
+not depend on the weight values, so this measures the compute each setup
+saves, not transcript quality.
+
+    python bench_language_cache.py --random-weights --model base --tokens 12
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+import whisper
+from whisper.model import ModelDimensions, Whisper
+from whisper.tokenizer import get_tokenizer
+
+# Published dimensions of the multilingual checkpoints
+MODEL_DIMS = {
+    'tiny': dict(n_audio_state=384, n_audio_head=6, n_audio_layer=4),
+    'base': dict(n_audio_state=512, n_audio_head=8, n_audio_layer=6),
+    'small': dict(n_audio_state=768, n_audio_head=12, n_audio_layer=12),
+}
+PROMPT_TEXT = ("we agreed to move the release to next friday and follow up with the team about the budget "
+               "forecast for the next quarter before the planning meeting on monday morning with everyone")
+
+
+def transcribe_chunks(model, chunks, options_for):
+    times, previous = [], None
+    for chunk in chunks:
+        options = options_for(previous)
+        started = time.perf_counter()
+        result = model.transcribe(chunk, **options)
+        times.append(time.perf_counter() - started)
+        previous = result
+    return np.array(times)
+
+
+def report(name, times, baseline):
+    mean = times.mean()
+    print(f"{name:>9}: mean {mean:.1f}ms  p50 {np.percentile(times, 50):.1f}ms  "
+          f"p95 {np.percentile(times, 95):.1f}ms  ({(1 - mean / baseline) * 100:+.1f}% saved vs baseline)")
+
+
+def run(args):
+    if args.random_weights:
+        return run_random_weights(args)
+    if not args.audio:
+        raise SystemExit('Pass a recording, or --random-weights to measure without one')
+    model = whisper.load_model(args.model)
+    audio = whisper.load_audio(args.audio)
+    size = int(args.chunk_seconds * whisper.audio.SAMPLE_RATE)
+    chunks = [audio[i:i + size] for i in range(0, len(audio) - size + 1, size)][:args.chunks]
+    if not chunks:
+        raise SystemExit('Recording is shorter than one chunk')
+    fp16 = model.device.type == 'cuda'
+
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(chunks[0]), model.dims.n_mels).to(model.device)
+    model.detect_language(mel)  # warm-up
+    started = time.perf_counter()
+    for _ in range(10):
+        _, probs = model.detect_language(mel)
+    detect_ms = (time.perf_counter() - started) / 10 * 1000
+    language = args.language or max(probs, key=probs.get)
+
+    setups = {
+        'baseline': lambda previous: {'fp16': fp16},
+        'language': lambda previous: {'fp16': fp16, 'language': language},
+        'session': lambda previous: dict(
+            {'fp16': fp16, 'language': language, 'without_timestamps': True},
+            **({'initial_prompt': previous['text'][-200:]} if previous and previous['text'].strip() else {})),
+    }
+
+    print(f"{len(chunks)} chunk(s) of {args.chunk_seconds}s, model '{args.model}' on {model.device}, "
+          f"language '{language}'; detect_language pass {detect_ms:.1f}ms")
+    baseline = None
+    for name, options_for in setups.items():
+        transcribe_chunks(model, chunks[:2], options_for)  # warm-up
+        times = transcribe_chunks(model, chunks, options_for) * 1000
+        baseline = baseline or times.mean()
+        report(name, times, baseline)
+
+
+def run_random_weights(args):
+    if args.model not in MODEL_DIMS:
+        raise SystemExit(f"--random-weights supports {', '.join(MODEL_DIMS)}")
+    torch.manual_seed(0)
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=1500, n_vocab=51865, n_text_ctx=448,
+                           n_text_state=MODEL_DIMS[args.model]['n_audio_state'],
+                           n_text_head=MODEL_DIMS[args.model]['n_audio_head'],
+                           n_text_layer=MODEL_DIMS[args.model]['n_audio_layer'],
+                           **MODEL_DIMS[args.model])
+    model = Whisper(dims).eval()
+    tokenizer = get_tokenizer(multilingual=True)
+    rng = np.random.default_rng(0)
+    chunk = (rng.standard_normal(int(args.chunk_seconds * whisper.audio.SAMPLE_RATE)) * 0.1).astype(np.float32)
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(chunk), dims.n_mels)
+    language = args.language or 'en'
+
+    def decode(**options):
+        # Timestamp mode emits a start and end timestamp around the text tokens
+        tokens = args.tokens if options.get('without_timestamps') else args.tokens + 2
+        return model.decode(mel, whisper.DecodingOptions(language=language, sample_len=tokens, fp16=False,
+                                                         suppress_tokens=[tokenizer.eot], **options))
+
+    setups = {
+        'baseline': lambda: (model.detect_language(mel), decode()),
+        'language': lambda: decode(),
+        'session': lambda: decode(without_timestamps=True, prompt=PROMPT_TEXT[-200:]),
+    }
+
+    def timed(fn):
+        fn()  # warm-up
+        times = []
+        for _ in range(args.chunks):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        return np.array(times) * 1000
+
+    detect = timed(lambda: model.detect_language(mel))
+    print(f"Random-weight '{args.model}' on cpu, {args.chunk_seconds}s chunk, {args.tokens} text tokens per chunk, "
+          f"{args.chunks} runs per setup; detect_language pass {detect.mean():.1f}ms")
+    baseline = None
+    for name, fn in setups.items():
+        times = timed(fn)
+        baseline = baseline or times.mean()
+        report(name, times, baseline)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark live-chunk decode state reuse')
+    parser.add_argument('audio', nargs='?', help='Recording to slice into live chunks')
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--chunk-seconds', type=float, default=3)
+    parser.add_argument('--chunks', type=int, default=40)
+    parser.add_argument('--language', help='Skip detection and use this language code')
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Time the model passes with random weights and synthetic audio')
+    parser.add_argument('--tokens', type=int, default=12, help='Text tokens decoded per chunk (--random-weights)')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    run(parse_args())
@@ -0,0 +1,118 @@
+"""Benchmark live latency while large uploads are transcribing.
+
+The Whisper model is simulated by sleeping for a fixed fraction of the audio
+duration, so the numbers show scheduling behaviour, not model speed. Two
+setups run the same workload:
+
+  fifo       every job is one unsegmented request and runs in arrival order
+             (what happens when all callers share the model directly)
+  priority   live chunks first, uploads split into segments, per-tenant fair share
+
+Workload: several uploads from two tenants (one tenant submits most of them),
+plus a live session sending a chunk every --live-interval seconds.
+
+    python bench_scheduler.py --uploads 4 --upload-minutes 10 --slo 1.0
+"""
+import argparse
+import threading
+import time
+
+from scheduler import PRIORITY_BATCH, PRIORITY_LIVE, TranscriptionScheduler, percentile
+
+BATCH_SEGMENT_SECONDS = 30
+
+
+def simulated_transcribe(audio_seconds, speed):
+    def run(previous):
+        time.sleep(audio_seconds * speed)
+        return audio_seconds
+    return run
+
+
+def upload_segments(total_seconds, speed, segmented):
+    if not segmented:
+        yield simulated_transcribe(total_seconds, speed)
+        return
+    remaining = total_seconds
+    while remaining > 0:
+        seconds = min(BATCH_SEGMENT_SECONDS, remaining)
+        yield simulated_transcribe(seconds, speed)
+        remaining -= seconds
+
+
+def run_workload(args, mode):
+    scheduler = TranscriptionScheduler().start()
+    segmented = mode == 'priority'
+    live_priority = PRIORITY_LIVE if mode == 'priority' else PRIORITY_BATCH
+    upload_seconds = args.upload_minutes * 60
+
+    uploads = []
+    for i in range(args.uploads):
+        # Tenant "a" submits all but the last upload; tenant "b" submits one
+        tenant = 'b' if i == args.uploads - 1 else 'a'
+        job = scheduler.submit(upload_segments(upload_seconds, args.speed, segmented), PRIORITY_BATCH,
+                               tenant if mode == 'priority' else 'shared')
+        uploads.append((tenant, job))
+
+    live_latencies = []
+    stop = threading.Event()
+
+    def live_session():
+        pending = []
+        while not stop.is_set():
+            job = scheduler.submit([simulated_transcribe(args.live_chunk_seconds, args.speed)], live_priority,
+                                   'live' if mode == 'priority' else 'shared')
+            pending.append(job)
+            time.sleep(args.live_interval)
+        for job in pending:
+            job.wait()
+            live_latencies.append(job.finished_at - job.submitted_at)
+
+    live = threading.Thread(target=live_session)
+    started = time.perf_counter()
+    live.start()
+    time.sleep(args.live_duration)
+    stop.set()
+    live.join()
+    for _, job in uploads:
+        job.wait()
+
+    latencies = sorted(live_latencies)
+    upload_done = {}
+    for tenant, job in uploads:
+        upload_done.setdefault(tenant, []).append(job.finished_at - started)
+    return {
+        'live_p50': percentile(latencies, 50),
+        'live_p95': percentile(latencies, 95),
+        'live_max': round(latencies[-1], 4) if latencies else None,
+        'live_chunks': len(latencies),
+        'upload_finish': {t: round(min(v), 2) for t, v in sorted(upload_done.items())},
+        'total': round(max(job.finished_at for _, job in uploads) - started, 2),
+    }
+
+
+def run(args):
+    print(f"{args.uploads} upload(s) of {args.upload_minutes} min, live chunk of {args.live_chunk_seconds}s "
+          f"every {args.live_interval}s for {args.live_duration}s, model speed {args.speed}s per audio second")
+    results = {mode: run_workload(args, mode) for mode in ('fifo', 'priority')}
+    for mode, r in results.items():
+        verdict = 'meets' if r['live_p95'] is not None and r['live_p95'] <= args.slo else 'MISSES'
+        print(f"{mode:>9}: live p50 {r['live_p50']}s p95 {r['live_p95']}s max {r['live_max']}s "
+              f"over {r['live_chunks']} chunks ({verdict} {args.slo}s SLO); "
+              f"first upload done per tenant {r['upload_finish']}; all done in {r['total']}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark live latency under concurrent uploads')
+    parser.add_argument('--uploads', type=int, default=4)
+    parser.add_argument('--upload-minutes', type=float, default=10)
+    parser.add_argument('--live-chunk-seconds', type=float, default=3)
+    parser.add_argument('--live-interval', type=float, default=0.5)
+    parser.add_argument('--live-duration', type=float, default=5)
+    parser.add_argument('--speed', type=float, default=0.005, help='Simulated model seconds per audio second')
+    parser.add_argument('--slo', type=float, default=1.0, help='Live turnaround SLO in seconds')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    run(parse_args())
@@ -0,0 +1,102 @@
+"""Benchmark the related-meetings index at archive scale.
+
+Builds an index of synthetic meetings (100k by default) in a temporary
+directory, then measures bulk indexing throughput, single-meeting updates and
+top-k lookup latency, both steady-state and for the first lookup after a write
+(which recomputes the cached IDF-weighted row norms).
+
+    python bench_similarity.py --meetings 100000 --queries 200
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from similarity_index import SimilarityIndex
+
+TOPICS = [
+    'budget forecast revenue quarter spending finance approval',
+    'hiring interview candidate onboarding recruiter offer',
+    'release deployment bug regression rollout hotfix testing',
+    'marketing campaign launch audience social brand',
+    'customer support ticket escalation churn feedback',
+    'roadmap feature priority planning sprint backlog',
+    'security audit incident access password compliance',
+    'infrastructure database latency outage scaling cluster',
+]
+FILLER = 'we discussed the next steps and agreed to follow up with the team by friday'.split()
+
+
+def synthetic_transcript(rng, words=400):
+    topic = rng.choice(TOPICS).split()
+    return ' '.join(rng.choice(topic) if rng.random() < 0.3 else rng.choice(FILLER) for _ in range(words))
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    path = tempfile.mkdtemp(prefix='similarity_bench_')
+    try:
+        index = SimilarityIndex(path, dim=args.dim)
+
+        started = time.perf_counter()
+        batch = []
+        for i in range(args.meetings):
+            batch.append((f"Meeting_{i:06d}", synthetic_transcript(rng)))
+            if len(batch) == 1000:
+                index.add_many(batch)
+                batch = []
+        if batch:
+            index.add_many(batch)
+        build = time.perf_counter() - started
+        print(f"Indexed {len(index)} meetings in {build:.1f}s ({len(index) / build:.0f} meetings/s), "
+              f"matrix {len(index) * args.dim * 4 / 1e6:.0f}MB")
+
+        update_times = []
+        for _ in range(args.queries):
+            key = f"Meeting_{rng.randrange(args.meetings):06d}"
+            text = synthetic_transcript(rng)
+            started = time.perf_counter()
+            index.add(key, text)
+            update_times.append(time.perf_counter() - started)
+
+        query_times, max_score = [], 0.0
+        for _ in range(args.queries):
+            key = f"Meeting_{rng.randrange(args.meetings):06d}"
+            started = time.perf_counter()
+            related = index.related(key, k=args.k)
+            query_times.append(time.perf_counter() - started)
+            max_score = max([max_score] + [score for _, score in related])
+
+        after_write_times = []
+        for _ in range(min(args.queries, 50)):
+            index.add(f"Meeting_{rng.randrange(args.meetings):06d}", synthetic_transcript(rng))
+            key = f"Meeting_{rng.randrange(args.meetings):06d}"
+            started = time.perf_counter()
+            index.related(key, k=args.k)
+            after_write_times.append(time.perf_counter() - started)
+
+        print(f"Highest related score {max_score:.4f}")
+        for name, times in (('update', update_times), ('related top-%d' % args.k, query_times),
+                            ('related after a write', after_write_times)):
+            ms = np.array(times) * 1000
+            print(f"{name}: p50 {np.percentile(ms, 50):.2f}ms  p95 {np.percentile(ms, 95):.2f}ms  "
+                  f"max {ms.max():.2f}ms over {len(ms)} calls")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the related-meetings similarity index')
+    parser.add_argument('--meetings', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--dim', type=int, default=512)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    run(parse_args())
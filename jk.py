@@ -11,6 +11,43 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'mp3', 'wav'}
 
+    # Chunked uploads (each chunk is its own request, so MAX_CONTENT_LENGTH applies per chunk)
+    UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+    UPLOAD_READ_BLOCK = 64 * 1024
+    MAX_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024  # 2GB per recording
+    UPLOAD_HEARTBEAT_SECONDS = 30  # processing uploads refresh heartbeat_at this often
+    UPLOAD_STALE_SECONDS = 120  # a processing upload without a heartbeat this long can be restarted
+    UPLOAD_TTL_SECONDS = 24 * 3600  # unfinished/failed uploads and their part files expire after this
+    UPLOAD_CLEANUP_INTERVAL = 3600
+
+    # Related meetings
+    SIMILARITY_INDEX_PATH = 'similarity_index_data'
+    SIMILARITY_DIM = 512
+    SIMILARITY_REINDEX_INTERVAL = 60  # the writing worker indexes meetings flagged similarity_stale this often
+
+    # Profiling: opt in per request with the X-Profile header or a socket payload
+    # 'profile' flag, or profile everything with PROFILING_ENABLED=1
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED") == "1"
+    PROFILE_FOLDER = 'profiles'
+    PROFILE_HISTORY = 200
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # required for /admin/*; unset disables them
+
+    # Live transcription backpressure
+    LIVE_QUEUE_MAX_DEPTH = 8  # queued audio_chunk batches per session
+    LIVE_COALESCE_MAX_BYTES = 2 * 1024 * 1024  # largest merged transcription request
+    LIVE_BACKPRESSURE_DEPTH = 2  # queue depth that asks the client to slow down
+    LIVE_BACKPRESSURE_LAG = 6.0  # seconds of lag that asks the client to slow down
+    LIVE_TIMESLICE_MS = 3000  # default MediaRecorder timeslice
+    LIVE_MAX_TIMESLICE_MS = 15000
+    # Off until measured: costs more than it saves on the tiny model, and carries
+    # hallucinated text from silent chunks into the next one
+    LIVE_PROMPT_PREVIOUS_TEXT = os.getenv("LIVE_PROMPT_PREVIOUS_TEXT") == "1"
+
+    # Transcription scheduling: long recordings are transcribed in windows of this
+    # length so live chunks can run between them
+    TRANSCRIBE_SEGMENT_SECONDS = 30
+    TRANSCRIBE_CUT_SEARCH_SECONDS = 3  # each window ends at the quietest 20ms in its last seconds
+
 # Gemini configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
@@ -0,0 +1,121 @@
+"""On-demand profiling for single requests and socket events.
+
+A profile covers one unit of work (an HTTP request, a socket event or the
+background task it hands off to). It records wall time per named stage and,
+when no other profile is running, a cProfile capture. cProfile hooks the whole
+OS thread, which every eventlet greenlet shares, so only one capture runs at a
+time; concurrent profiles record stage timings only, and a capture may include
+calls from unprofiled greenlets that ran while it was waiting on I/O.
+
+Profiles are kept in a bounded in-memory list; the raw pstats dumps are
+written to disk and removed when a profile falls off the list.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+_local = threading.local()
+_profiler_lock = threading.Lock()
+_profiles_lock = threading.Lock()
+
+
+class ProfileStore:
+    def __init__(self, folder, history=200):
+        self.folder = folder
+        self.profiles = deque()
+        self.history = history
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, profile_id):
+        return os.path.join(self.folder, f"{profile_id}.prof")
+
+    def add(self, record, profiler=None):
+        if profiler is not None:
+            profiler.dump_stats(self.path(record['profile_id']))
+            record['has_cprofile'] = True
+        with _profiles_lock:
+            self.profiles.append(record)
+            while len(self.profiles) > self.history:
+                evicted = self.profiles.popleft()
+                if evicted.get('has_cprofile') and os.path.exists(self.path(evicted['profile_id'])):
+                    os.remove(self.path(evicted['profile_id']))
+
+    def get(self, profile_id):
+        with _profiles_lock:
+            return next((p for p in self.profiles if p['profile_id'] == profile_id), None)
+
+    def slowest(self, stage=None, limit=20):
+        """Return recent profiles ordered by time spent in `stage` (or in total)"""
+        with _profiles_lock:
+            profiles = list(self.profiles)
+        if stage:
+            profiles = [p for p in profiles if stage in p['stages']]
+            key = lambda p: p['stages'][stage]
+        else:
+            key = lambda p: p['duration']
+        return sorted(profiles, key=key, reverse=True)[:limit]
+
+    def stats_text(self, profile_id, sort='cumulative', limit=40):
+        path = self.path(profile_id)
+        if not os.path.exists(path):
+            return None
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+def current_profile():
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def profile_scope(store, name, enabled, meta=None):
+    """Profile the enclosed block when `enabled`; yields the profile record or None"""
+    if not enabled or current_profile() is not None:
+        yield current_profile()
+        return
+
+    record = {
+        'profile_id': uuid.uuid4().hex,
+        'name': name,
+        'started_at': datetime.utcnow().isoformat(),
+        'duration': 0.0,
+        'stages': {},
+        'meta': meta or {},
+        'has_cprofile': False,
+    }
+    profiler = cProfile.Profile() if _profiler_lock.acquire(blocking=False) else None
+    _local.profile = record
+    started = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        yield record
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _profiler_lock.release()
+        record['duration'] = round(time.perf_counter() - started, 4)
+        _local.profile = None
+        store.add(record, profiler)
+
+
+@contextmanager
+def profile_stage(name):
+    """Add the wall time of the enclosed block to the current profile's `name` stage"""
+    record = current_profile()
+    if record is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record['stages'][name] = round(record['stages'].get(name, 0.0) + time.perf_counter() - started, 4)
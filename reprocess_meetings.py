@@ -0,0 +1,180 @@
+"""Batch reprocessing for the meeting archive.
+
+Regenerates summaries (and optionally transcripts) for stored meetings after a
+change to the Whisper model or the summary prompt. Meetings are streamed with a
+server-side cursor in _id order, processed with bounded concurrency and written
+back with bulk updates. Progress is checkpointed after every bulk write so an
+interrupted run resumes where it stopped.
+
+    python reprocess_meetings.py --mode summary --workers 4
+    python reprocess_meetings.py --mode transcript --audio-dir uploads/archive
+"""
+# app runs eventlet.monkey_patch(), which must happen before anything else is imported
+from app import app, meetings_collection, summarize_chunks, transcribe_audio
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+import eventlet
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from scheduler import PRIORITY_BATCH
+
+DEFAULT_CHECKPOINT = 'reprocess_checkpoint.json'
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def build_query(args, last_id):
+    query = {}
+    if last_id:
+        query['_id'] = {'$gt': ObjectId(last_id)}
+    if args.meeting_type:
+        query['meeting_type'] = args.meeting_type
+    if args.since:
+        query['timestamp'] = {'$gte': datetime.strptime(args.since, '%Y-%m-%d')}
+    return query
+
+
+def reprocess_meeting(meeting, args):
+    """Return (meeting_id, fields_to_set, error) for one meeting"""
+    try:
+        transcript = meeting.get('transcript', '')
+        fields = {}
+        if args.mode == 'transcript':
+            audio_path = os.path.join(args.audio_dir, meeting['filename'])
+            if not os.path.exists(audio_path):
+                return meeting['_id'], None, f"audio not found: {audio_path}"
+            transcript = transcribe_audio(audio_path, PRIORITY_BATCH, 'reprocess')
+            fields['transcript'] = transcript
+        if not transcript or not transcript.strip():
+            return meeting['_id'], None, 'empty transcript'
+        # summarize_chunks runs each Gemini call in a native thread and the scheduler
+        # offloads Whisper, so the greenlets in the window overlap their waits
+        fields['summary'], fields['summary_chunks'], _ = summarize_chunks(transcript)
+        fields['updated_at'] = datetime.utcnow()
+        fields['reprocessed_at'] = fields['updated_at']
+        # The server process that owns the similarity index re-indexes flagged meetings
+        fields['similarity_stale'] = True
+        return meeting['_id'], fields, None
+    except Exception as e:
+        return meeting['_id'], None, str(e)
+
+
+def flush(operations, checkpoint, args):
+    if operations:
+        meetings_collection.bulk_write(operations, ordered=False)
+        operations.clear()
+    # A dry run must not move last_id, or the real run would resume past meetings it never wrote
+    if not args.dry_run:
+        save_checkpoint(args.checkpoint, checkpoint)
+
+
+def process_in_order(cursor, args):
+    """Yield reprocess results in cursor order with at most --workers meetings in
+    flight, so the last yielded _id is always a safe resume point"""
+    window = deque()
+    for meeting in cursor:
+        if len(window) >= args.workers:
+            yield window.popleft().wait()
+        window.append(eventlet.spawn(reprocess_meeting, meeting, args))
+    while window:
+        yield window.popleft().wait()
+
+
+def run(args):
+    if args.mode == 'transcript' and not args.audio_dir:
+        raise SystemExit('--audio-dir is required to re-transcribe meetings')
+
+    # last_id is only a valid resume point for the same filters it was taken under
+    filters = {'meeting_type': args.meeting_type, 'since': args.since}
+    checkpoint = None if args.restart else load_checkpoint(args.checkpoint)
+    if checkpoint and checkpoint.get('mode') != args.mode:
+        raise SystemExit(f"Checkpoint {args.checkpoint} is for mode '{checkpoint.get('mode')}'; use --restart")
+    if checkpoint and checkpoint.get('filters') != filters:
+        raise SystemExit(f"Checkpoint {args.checkpoint} is for filters {checkpoint.get('filters')}; use --restart")
+    if not checkpoint:
+        checkpoint = {'mode': args.mode, 'filters': filters, 'last_id': None, 'processed': 0, 'failed': 0,
+                      'failed_ids': []}
+
+    query = build_query(args, checkpoint['last_id'])
+    total = meetings_collection.count_documents(query)
+    if args.limit:
+        total = min(total, args.limit)
+    projection = {'filename': 1, 'transcript': 1}
+    cursor = meetings_collection.find(query, projection, no_cursor_timeout=True) \
+        .sort('_id', 1).batch_size(args.batch_size)
+    if args.limit:
+        cursor = cursor.limit(args.limit)
+
+    print(f"Reprocessing {total} meeting(s) in '{args.mode}' mode with {args.workers} worker(s)")
+    if checkpoint['last_id']:
+        print(f"Resuming after {checkpoint['last_id']} ({checkpoint['processed']} already done)")
+
+    operations = []
+    done = 0
+    started = time.monotonic()
+    try:
+        for meeting_id, fields, error in process_in_order(cursor, args):
+            done += 1
+            if error:
+                checkpoint['failed'] += 1
+                checkpoint['failed_ids'].append(str(meeting_id))
+                app.logger.error(f"Reprocess failed for {meeting_id}: {error}")
+            else:
+                checkpoint['processed'] += 1
+                if not args.dry_run:
+                    operations.append(UpdateOne({'_id': meeting_id}, {'$set': fields}))
+            checkpoint['last_id'] = str(meeting_id)
+
+            if done % args.batch_size == 0:
+                flush(operations, checkpoint, args)
+                elapsed = time.monotonic() - started
+                print(f"  {done}/{total} meetings, {done / elapsed:.2f} meetings/s, {checkpoint['failed']} failed")
+    finally:
+        cursor.close()
+        flush(operations, checkpoint, args)
+
+    elapsed = time.monotonic() - started
+    rate = done / elapsed if elapsed else 0.0
+    print(f"Done: {done} meeting(s) in {elapsed:.1f}s ({rate:.2f} meetings/s), "
+          f"{checkpoint['failed']} failed in total. "
+          + ('Dry run: checkpoint not written' if args.dry_run else f"Checkpoint: {args.checkpoint}"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerate summaries/transcripts for stored meetings')
+    parser.add_argument('--mode', choices=['summary', 'transcript'], default='summary',
+                        help="'summary' re-summarizes stored transcripts; 'transcript' re-transcribes "
+                             "from --audio-dir and then re-summarizes")
+    parser.add_argument('--audio-dir', help='Directory holding the original audio, named by meeting filename')
+    parser.add_argument('--workers', type=int, default=4, help='Meetings processed concurrently')
+    parser.add_argument('--batch-size', type=int, default=50, help='Cursor batch and bulk write size')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Checkpoint file used for resuming')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+    parser.add_argument('--meeting-type', help="Only meetings of this type, e.g. 'upload' or 'live'")
+    parser.add_argument('--since', help='Only meetings recorded on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, help='Stop after this many meetings')
+    parser.add_argument('--dry-run', action='store_true', help='Process but do not write results or the checkpoint')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    run(parse_args())
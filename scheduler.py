@@ -0,0 +1,167 @@
+"""Priority scheduling for the shared Whisper model.
+
+All transcription goes through one dispatcher, which runs one segment at a
+time. A job is a sequence of segments (a live chunk is a single segment; a
+long recording is split into fixed-length windows). After each segment the
+dispatcher picks the next one again, so live work waits for at most one batch
+segment instead of a whole upload.
+
+Selection order:
+  1. the lowest priority class with pending work (PRIORITY_LIVE first),
+  2. within that class, the tenant that has used the least model time so far
+     (tenants joining late start at the current minimum, so they don't get a
+     burst of catch-up time),
+  3. within that tenant, jobs in submission order.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+
+PRIORITY_LIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_LIVE: 'live', PRIORITY_BATCH: 'batch'}
+LATENCY_HISTORY = 500
+MAX_IDLE_TENANTS = 1000
+
+
+class Job:
+    def __init__(self, segments, priority, tenant):
+        self.segments = iter(segments)
+        self.next_segment = next(self.segments, None)
+        self.priority = priority
+        self.tenant = tenant
+        self.results = []
+        self.error = None
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until every segment ran; returns the list of segment results"""
+        if not self.done.wait(timeout):
+            raise TimeoutError('Transcription job did not finish in time')
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+class TranscriptionScheduler:
+    def __init__(self, run_segment=None):
+        # run_segment(fn, previous_results) lets the app move model calls off
+        # the event loop (e.g. eventlet.tpool.execute)
+        self.run_segment = run_segment or (lambda fn, previous: fn(previous))
+        self.condition = threading.Condition()
+        self.queues = defaultdict(lambda: defaultdict(deque))  # priority -> tenant -> jobs
+        self.usage = defaultdict(float)  # tenant -> model seconds used
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_HISTORY))
+        self.running = None
+        self.thread = None
+
+    def start(self):
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._dispatch_loop, name='transcription-scheduler', daemon=True)
+                self.thread.start()
+        return self
+
+    def submit(self, segments, priority=PRIORITY_BATCH, tenant='default'):
+        """Queue a job. Each segment is a callable taking the results of the previous segments"""
+        job = Job(segments, priority, tenant)
+        if job.next_segment is None:
+            job.done.set()
+            return job
+        with self.condition:
+            if not self._is_active(tenant):
+                active = [self.usage[t] for t in list(self.usage) if self._is_active(t)]
+                if active:
+                    self.usage[tenant] = max(self.usage[tenant], min(active))
+            self.queues[priority][tenant].append(job)
+            self.condition.notify()
+        self.start()
+        return job
+
+    def run(self, fn, priority=PRIORITY_BATCH, tenant='default', timeout=None):
+        """Run a single-segment job and return its result"""
+        return self.submit([lambda previous: fn()], priority, tenant).wait(timeout)[0]
+
+    def _is_active(self, tenant):
+        if self.running is not None and self.running.tenant == tenant:
+            return True
+        return any(self.queues[p].get(tenant) for p in self.queues)
+
+    def _prune_idle_tenants(self):
+        idle = [t for t in self.usage if not self._is_active(t)]
+        if len(idle) > MAX_IDLE_TENANTS:
+            for tenant in idle:
+                del self.usage[tenant]
+                for priority in self.queues:
+                    self.queues[priority].pop(tenant, None)
+
+    def _next_job(self):
+        for priority in sorted(self.queues):
+            tenants = [t for t, jobs in self.queues[priority].items() if jobs]
+            if tenants:
+                tenant = min(tenants, key=lambda t: self.usage[t])
+                return self.queues[priority][tenant].popleft()
+        return None
+
+    def _dispatch_loop(self):
+        while True:
+            with self.condition:
+                job = self._next_job()
+                while job is None:
+                    self.condition.wait()
+                    job = self._next_job()
+                self.running = job
+
+            started = time.perf_counter()
+            if job.started_at is None:
+                job.started_at = started
+            try:
+                job.results.append(self.run_segment(job.next_segment, job.results))
+                job.next_segment = next(job.segments, None)
+                finished = job.next_segment is None
+            except Exception as e:
+                job.error = e
+                finished = True
+            elapsed = time.perf_counter() - started
+
+            with self.condition:
+                self.usage[job.tenant] += elapsed
+                self.running = None
+                if finished:
+                    job.finished_at = time.perf_counter()
+                    self.latencies[job.priority].append((job.started_at - job.submitted_at,
+                                                         job.finished_at - job.submitted_at))
+                    job.done.set()
+                    self._prune_idle_tenants()
+                else:
+                    # Back to the front of its tenant queue: the next pick re-checks priorities
+                    self.queues[job.priority][job.tenant].appendleft(job)
+
+    def stats(self):
+        """Queue depth per class and recent wait/turnaround percentiles in seconds"""
+        with self.condition:
+            result = {}
+            for priority in sorted(set(self.queues) | set(self.latencies)):
+                samples = list(self.latencies[priority])
+                waits = sorted(s[0] for s in samples)
+                totals = sorted(s[1] for s in samples)
+                result[PRIORITY_NAMES.get(priority, str(priority))] = {
+                    'queued_jobs': sum(len(jobs) for jobs in self.queues[priority].values()),
+                    'completed': len(samples),
+                    'wait_p50': percentile(waits, 50),
+                    'wait_p95': percentile(waits, 95),
+                    'turnaround_p50': percentile(totals, 50),
+                    'turnaround_p95': percentile(totals, 95),
+                }
+            result['tenant_usage'] = {t: round(u, 3) for t, u in self.usage.items()}
+            return result
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 4)
@@ -0,0 +1,51 @@
+"""Splitting long inputs into units of work.
+
+segment_bounds cuts a recording into transcription windows at pauses, and
+split_into_chunks cuts a transcript into summary chunks at content-defined
+sentence ends. Both are pure functions of their input.
+"""
+import zlib
+
+import numpy as np
+
+
+def segment_bounds(audio, segment_samples, search_samples, frame_samples=320):
+    """Yield (start, end) windows of at most segment_samples. Each window ends at
+    the quietest frame of its last search_samples, so cuts fall in pauses
+    between words rather than in the middle of one"""
+    start = 0
+    while True:
+        end = start + segment_samples
+        if end >= len(audio):
+            yield start, len(audio)
+            return
+        search_start = max(start + frame_samples, end - search_samples)
+        frames = (end - search_start) // frame_samples
+        if frames > 0:
+            region = audio[search_start:search_start + frames * frame_samples].reshape(frames, frame_samples)
+            quietest = int(np.argmin(np.square(region).mean(axis=1)))
+            end = search_start + quietest * frame_samples + frame_samples // 2
+        yield start, end
+        start = end
+
+
+def split_into_chunks(text, max_tokens=3000):
+    """Split on sentence ends picked by content, not position, so an edit only
+    moves the chunk boundaries next to it and the other chunks keep their hashes"""
+    sentences = text.split('. ')
+    # A cut is allowed after 70% of max_tokens on 1 in 6 sentences, which keeps
+    # chunks close to the greedy packing (~1.15x as many) while most edits
+    # still re-summarize one or two chunks
+    min_tokens = max_tokens * 7 // 10
+    chunks, chunk = [], ""
+    for i, sentence in enumerate(sentences):
+        if chunk and len(chunk + sentence) >= max_tokens:
+            chunks.append(chunk.strip())
+            chunk = ""
+        chunk += sentence + ('. ' if i < len(sentences) - 1 else '')
+        if len(chunk) >= min_tokens and zlib.crc32(sentence.encode()) % 6 == 0:
+            chunks.append(chunk.strip())
+            chunk = ""
+    if chunk.strip() or not chunks:
+        chunks.append(chunk.strip())
+    return chunks
@@ -0,0 +1,277 @@
+"""Related-meetings index.
+
+Every meeting is stored as one fixed-size row: hashed, sublinear term
+frequencies, L2-normalized, in a float32 memory-mapped matrix. Document
+frequencies per hash bucket are kept next to it. IDF weights are not stored in
+the rows, so adding or updating a meeting touches one row and the bucket
+counts and nothing else. Scores are the cosine similarity of the IDF-weighted
+vectors: a lookup is one matrix-vector product over all rows, divided by the
+IDF-weighted row norms, followed by a partial sort. The row norms depend on
+the current IDF, so they are cached and recomputed on the first lookup after a
+write.
+
+One process writes; the writer takes an exclusive lock on writer.lock the
+first time it adds a meeting. Every other process (other server workers, the
+reprocess CLI) opens the index read-only and reloads it when the writer
+commits. A write is committed by replacing state.npz: rows and keys past the
+committed count are ignored by readers and truncated by the next writer, so a
+crash mid-write never leaves rows.txt and the document frequencies out of step.
+
+Files under the index directory:
+    vectors.f32  rows x dim float32 matrix (grown by doubling)
+    rows.txt     meeting key per row, append-only
+    state.npz    committed row count and per-bucket document frequency
+    writer.lock  held by the writing process
+"""
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+TOKEN_RE = re.compile(r"[a-z0-9']{2,}")
+INITIAL_CAPACITY = 1024
+NORM_BLOCK_ROWS = 4096
+
+
+class IndexLockedError(RuntimeError):
+    """Raised when writing to an index whose writer lock another process holds"""
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class SimilarityIndex:
+    def __init__(self, path, dim=512):
+        self.path = path
+        self.dim = dim
+        self.lock = threading.Lock()
+        self.writable = False
+        self.lock_file = None
+        os.makedirs(path, exist_ok=True)
+
+        self.keys = []
+        self.rows = {}
+        self.rows_offset = 0
+        self.df = np.zeros(dim, dtype=np.int64)
+        self.state_version = None
+        self.capacity = 0
+        self.vectors = None
+        self.row_norms = None
+        self._reload()
+
+    def __len__(self):
+        self._refresh()
+        return len(self.keys)
+
+    def __contains__(self, key):
+        self._refresh()
+        return key in self.rows
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_state_version(self):
+        try:
+            stat = os.stat(self._file('state.npz'))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _refresh(self):
+        """Pick up commits made by the writing process (readers only)"""
+        if not self.writable and self._read_state_version() != self.state_version:
+            with self.lock:
+                if not self.writable:
+                    self._reload()
+
+    def _reload(self):
+        """Load the last committed state; caller holds self.lock (or is __init__)"""
+        self.row_norms = None
+        self.state_version = self._read_state_version()
+        count = None
+        if self.state_version is not None:
+            with np.load(self._file('state.npz')) as state:
+                count, df = int(state['count']), state['df']
+            if df.shape != (self.dim,):
+                raise ValueError(f"Index at {self.path} was built with dim={df.shape[0]}, not {self.dim}")
+
+        if count is None or count < len(self.keys):
+            self.keys, self.rows, self.rows_offset = [], {}, 0
+        if os.path.exists(self._file('rows.txt')):
+            with open(self._file('rows.txt'), 'rb') as f:
+                f.seek(self.rows_offset)
+                while count is None or len(self.keys) < count:
+                    line = f.readline()
+                    if not line.endswith(b'\n'):
+                        break
+                    self.rows[line[:-1].decode()] = len(self.keys)
+                    self.keys.append(line[:-1].decode())
+                    self.rows_offset += len(line)
+        self._open_vectors(max(INITIAL_CAPACITY, len(self.keys)))
+        # Indexes written before state.npz existed: recount the frequencies from the vectors
+        self.df = df if count is not None else (self.vectors[:len(self.keys)] > 0).sum(axis=0).astype(np.int64)
+
+    def _open_vectors(self, capacity):
+        vectors_path = self._file('vectors.f32')
+        size = capacity * self.dim * 4
+        if self.vectors is not None:
+            if self.writable:
+                self.vectors.flush()
+            self.vectors = None
+        if not self.writable:
+            size = os.path.getsize(vectors_path) if os.path.exists(vectors_path) else 0
+            self.capacity = size // (self.dim * 4)
+            self.vectors = np.memmap(vectors_path, dtype=np.float32, mode='r', shape=(self.capacity, self.dim)) \
+                if self.capacity else np.zeros((0, self.dim), dtype=np.float32)
+            return
+        with open(vectors_path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+            else:
+                capacity = f.tell() // (self.dim * 4)
+        self.vectors = np.memmap(vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def acquire_writer(self):
+        """Become the writing process if no other process is; returns whether this one writes"""
+        if self.writable:
+            return True
+        with self.lock:
+            if self.writable:
+                return True
+            lock_file = open(self._file('writer.lock'), 'a+')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                lock_file.close()
+                return False
+            self.lock_file = lock_file
+            self.writable = True
+            self.vectors = None
+            self._reload()
+            # Drop keys a crashed writer appended but never committed
+            with open(self._file('rows.txt'), 'ab') as f:
+                f.truncate(self.rows_offset)
+            if self.state_version is None:
+                self._commit()
+            return True
+
+    def vectorize(self, text):
+        """Return the normalized hashed term-frequency vector for `text`"""
+        tokens = tokenize(text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not tokens:
+            return vector
+        buckets = np.fromiter((zlib.crc32(t.encode()) % self.dim for t in tokens), dtype=np.int64, count=len(tokens))
+        counts = np.bincount(buckets, minlength=self.dim).astype(np.float32)
+        np.log1p(counts, out=vector)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector
+
+    def idf(self):
+        return np.log((1 + len(self.keys)) / (1 + self.df)).astype(np.float32) + 1.0
+
+    def add(self, key, text):
+        """Insert or replace the vector for `key`"""
+        self.add_many([(key, text)])
+
+    def add_many(self, items):
+        """Bulk insert of (key, text) pairs, committing once at the end"""
+        if not self.acquire_writer():
+            raise IndexLockedError(f"Similarity index at {self.path} is being written by another process")
+        vectors = [(key, self.vectorize(text)) for key, text in items]
+        with self.lock:
+            self.row_norms = None
+            new_keys = []
+            for key, vector in vectors:
+                row = self.rows.get(key)
+                if row is None:
+                    row = len(self.keys)
+                    if row >= self.capacity:
+                        self._open_vectors(self.capacity * 2)
+                    self.keys.append(key)
+                    self.rows[key] = row
+                    new_keys.append(key)
+                else:
+                    self.df -= self.vectors[row] > 0
+                self.vectors[row] = vector
+                self.df += vector > 0
+            self.vectors.flush()
+            if new_keys:
+                data = ''.join(key + '\n' for key in new_keys).encode()
+                with open(self._file('rows.txt'), 'ab') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.rows_offset += len(data)
+            self._commit()
+
+    def _commit(self):
+        tmp_path = self._file('state.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, count=len(self.keys), df=self.df)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._file('state.npz'))
+        self.state_version = self._read_state_version()
+
+    def query(self, vector, k=5, exclude=None):
+        """Return up to k (key, score) pairs most similar to `vector`"""
+        self._refresh()
+        with self.lock:
+            count = len(self.keys)
+            if count == 0 or not vector.any():
+                return []
+            idf = self.idf()
+            if self.row_norms is None:
+                self.row_norms = self._weighted_norms(count, idf * idf)
+            weighted = vector * idf
+            weighted /= np.linalg.norm(weighted)
+            scores = self.vectors[:count] @ (weighted * idf)
+            np.divide(scores, self.row_norms, out=scores, where=self.row_norms > 0)
+            if exclude is not None and exclude in self.rows:
+                scores[self.rows[exclude]] = -np.inf
+            k = min(k, count - (exclude in self.rows))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.keys[row], float(scores[row])) for row in top if scores[row] > 0]
+
+    def _weighted_norms(self, count, idf_squared):
+        """L2 norm of every IDF-weighted row, computed in blocks to bound temporary memory"""
+        norms = np.empty(count, dtype=np.float32)
+        for start in range(0, count, NORM_BLOCK_ROWS):
+            block = self.vectors[start:min(start + NORM_BLOCK_ROWS, count)]
+            norms[start:start + len(block)] = np.sqrt((block * block) @ idf_squared)
+        return norms
+
+    def related(self, key, k=5):
+        """Return meetings similar to the indexed meeting `key`"""
+        self._refresh()
+        with self.lock:
+            row = self.rows.get(key)
+            vector = None if row is None else np.array(self.vectors[row])
+        if vector is None:
+            return []
+        return self.query(vector, k, exclude=key)
+
+    def flush(self):
+        with self.lock:
+            if self.writable:
+                self.vectors.flush()
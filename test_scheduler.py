@@ -0,0 +1,62 @@
+import threading
+import time
+
+from scheduler import PRIORITY_BATCH, PRIORITY_LIVE, TranscriptionScheduler
+
+
+def recorder(log, name, duration=0.0, gate=None):
+    def run(previous):
+        if gate is not None:
+            gate.wait(5)
+        time.sleep(duration)
+        log.append(name)
+        return name
+    return run
+
+
+def test_live_job_runs_between_batch_segments():
+    scheduler = TranscriptionScheduler().start()
+    log, gate = [], threading.Event()
+    batch = scheduler.submit([recorder(log, 'batch-1', gate=gate)] + [recorder(log, f'batch-{i}') for i in (2, 3)],
+                             PRIORITY_BATCH, 'uploads')
+    time.sleep(0.05)  # batch-1 is running and blocked on the gate
+    live = scheduler.submit([recorder(log, 'live')], PRIORITY_LIVE, 'live')
+    gate.set()
+    assert live.wait(5) == ['live']
+    assert batch.wait(5) == ['batch-1', 'batch-2', 'batch-3']
+    assert log == ['batch-1', 'live', 'batch-2', 'batch-3']
+
+
+def test_tenants_share_the_model_fairly():
+    scheduler = TranscriptionScheduler().start()
+    log, gate = [], threading.Event()
+    blocker = scheduler.submit([recorder(log, 'gate', gate=gate)], PRIORITY_BATCH, 'gate')
+    time.sleep(0.05)
+    # Tenant a queues two long jobs before tenant b queues one
+    heavy = [scheduler.submit([recorder(log, 'a', 0.01) for _ in range(3)], PRIORITY_BATCH, 'a') for _ in range(2)]
+    light = scheduler.submit([recorder(log, 'b', 0.01) for _ in range(3)], PRIORITY_BATCH, 'b')
+    gate.set()
+    for job in [blocker, light] + heavy:
+        job.wait(5)
+    work = log[1:]
+    # In arrival order b would start after all six of a's segments; with fair share
+    # it alternates with a and is done within the first six segments
+    assert max(i for i, name in enumerate(work) if name == 'b') < 6
+    assert light.finished_at < heavy[1].finished_at
+
+
+def test_failed_segment_fails_only_its_job():
+    scheduler = TranscriptionScheduler().start()
+
+    def boom(previous):
+        raise ValueError('decode failed')
+
+    failed = scheduler.submit([boom, recorder([], 'never')], PRIORITY_BATCH, 'a')
+    ok = scheduler.submit([recorder([], 'fine')], PRIORITY_BATCH, 'a')
+    assert ok.wait(5) == ['fine']
+    try:
+        failed.wait(5)
+    except ValueError as e:
+        assert str(e) == 'decode failed'
+    else:
+        raise AssertionError('expected the segment error')
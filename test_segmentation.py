@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+
+from segmentation import segment_bounds, split_into_chunks
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_speech(seconds, seed=0):
+    """Bursts of loud noise ("words") separated by short near-silent gaps"""
+    rng = np.random.default_rng(seed)
+    parts, gaps, position = [], [], 0
+    while position < seconds * SAMPLE_RATE:
+        word = int(rng.uniform(0.2, 0.6) * SAMPLE_RATE)
+        gap = int(rng.uniform(0.05, 0.4) * SAMPLE_RATE)
+        parts += [rng.normal(0, 0.3, word), rng.normal(0, 0.003, gap)]
+        gaps.append((position + word, position + word + gap))
+        position += word + gap
+    return np.concatenate(parts).astype(np.float32), gaps
+
+
+def test_segments_are_cut_inside_gaps():
+    audio, gaps = synthetic_speech(95)
+    bounds = list(segment_bounds(audio, 30 * SAMPLE_RATE, 3 * SAMPLE_RATE))
+    assert len(bounds) == 4
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(audio)
+    for (_, end), (start, _) in zip(bounds, bounds[1:]):
+        assert end == start
+    for start, end in bounds:
+        assert 0 < end - start <= 30 * SAMPLE_RATE
+    for _, end in bounds[:-1]:
+        assert any(gap_start <= end < gap_end for gap_start, gap_end in gaps)
+
+
+def test_short_and_empty_audio_is_one_segment():
+    assert list(segment_bounds(np.zeros(0, np.float32), 30 * SAMPLE_RATE, 3 * SAMPLE_RATE)) == [(0, 0)]
+    assert list(segment_bounds(np.zeros(100, np.float32), 30 * SAMPLE_RATE, 3 * SAMPLE_RATE)) == [(0, 100)]
+
+
+def synthetic_sentences(count, seed=1):
+    rng = random.Random(seed)
+    words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 9)))
+             for _ in range(2000)]
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(4, 30))) for _ in range(count)]
+
+
+def test_chunks_respect_max_size_and_keep_the_text():
+    text = '. '.join(synthetic_sentences(1600))
+    chunks = split_into_chunks(text)
+    assert all(len(chunk) <= 3000 for chunk in chunks)
+    assert ' '.join(chunks).split() == text.split()
+    # Close to the greedy packing of ~3000 characters per chunk
+    assert len(chunks) <= 1.3 * len(text) / 3000
+
+
+def test_edit_changes_only_nearby_chunks():
+    sentences = synthetic_sentences(1600)
+    before = set(split_into_chunks('. '.join(sentences)))
+    edited = list(sentences)
+    del edited[800]
+    edited.insert(400, 'an extra sentence added while correcting the transcript')
+    after = split_into_chunks('. '.join(edited))
+    changed = [chunk for chunk in after if chunk not in before]
+    # Position-based splitting would change every chunk after the first edit (over half)
+    assert len(changed) < len(after) // 5
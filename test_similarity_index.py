@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from similarity_index import IndexLockedError, SimilarityIndex
+
+MEETINGS = {
+    'budget': 'budget forecast revenue quarter budget approval',
+    'hiring': 'hiring interview candidate onboarding budget',
+    'finance': 'budget revenue quarter spending finance',
+    'security': 'security audit incident access password',
+}
+
+
+def brute_force_cosine(index, key):
+    """Cosine similarity of the IDF-weighted vectors, computed directly"""
+    idf = index.idf()
+    weighted = {k: np.array(index.vectors[index.rows[k]]) * idf for k in index.keys}
+    query = weighted[key]
+    return {k: float(v @ query / (np.linalg.norm(v) * np.linalg.norm(query)))
+            for k, v in weighted.items() if k != key}
+
+
+def test_related_scores_are_idf_weighted_cosine(tmp_path):
+    index = SimilarityIndex(str(tmp_path), dim=64)
+    index.add_many(MEETINGS.items())
+    expected = brute_force_cosine(index, 'budget')
+    related = index.related('budget', k=3)
+    assert [key for key, _ in related] == sorted((k for k in expected if expected[k] > 0),
+                                                 key=expected.get, reverse=True)
+    for key, score in related:
+        assert score == pytest.approx(expected[key], abs=1e-5)
+        assert 0 < score <= 1
+
+
+def test_reader_reloads_after_writer_commits(tmp_path):
+    writer = SimilarityIndex(str(tmp_path), dim=64)
+    reader = SimilarityIndex(str(tmp_path), dim=64)
+    writer.add_many(list(MEETINGS.items())[:2])
+    assert len(reader) == 2 and 'hiring' in reader
+    writer.add_many(list(MEETINGS.items())[2:])
+    assert len(reader) == 4
+    assert reader.related('budget', k=3) == writer.related('budget', k=3)
+
+
+def test_second_writer_is_refused(tmp_path):
+    writer = SimilarityIndex(str(tmp_path), dim=64)
+    other = SimilarityIndex(str(tmp_path), dim=64)
+    writer.add('budget', MEETINGS['budget'])
+    assert not other.acquire_writer()
+    with pytest.raises(IndexLockedError):
+        other.add('hiring', MEETINGS['hiring'])
+
+
+def test_uncommitted_rows_are_ignored_and_truncated(tmp_path):
+    writer = SimilarityIndex(str(tmp_path), dim=64)
+    writer.add_many(MEETINGS.items())
+    # A writer that crashed after appending a key but before committing state.npz
+    with open(tmp_path / 'rows.txt', 'a') as f:
+        f.write('ghost\n')
+    reader = SimilarityIndex(str(tmp_path), dim=64)
+    assert len(reader) == 4 and 'ghost' not in reader
+
+    writer.lock_file.close()  # release the lock as a crashed process would
+    recovered = SimilarityIndex(str(tmp_path), dim=64)
+    assert recovered.acquire_writer()
+    assert (tmp_path / 'rows.txt').read_text().split() == list(MEETINGS)